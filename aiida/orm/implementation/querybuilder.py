@@ -80,6 +80,8 @@ GROUP_ENTITY_TYPE_PREFIX = 'group.'
 class BackendQueryBuilder(abc.ABC):
     """Backend query builder interface"""
 
+    __slots__ = ('_backend',)
+
     def __init__(self, backend: 'StorageBackend'):
         """
         :param backend: the backend
@@ -10,13 +10,13 @@
 # pylint: disable=unnecessary-lambda-assignment
 """A module containing the logic for creating joined queries."""
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, Optional, Protocol, Type
+from typing import Any, Callable, Dict, Optional, Protocol, Tuple, Type
 
 from sqlalchemy import and_, join, select
 from sqlalchemy.dialects.postgresql import array
 from sqlalchemy.orm import Query, aliased
 from sqlalchemy.orm.util import AliasedClass
-from sqlalchemy.sql.elements import BooleanClauseList
+from sqlalchemy.sql.elements import BooleanClauseList, ColumnElement
 from sqlalchemy.sql.expression import cast as type_cast
 from sqlalchemy.sql.schema import Table
 from sqlalchemy.types import Integer
@@ -364,6 +364,35 @@ class SqlaJoiner:
         ).join(entity_to_join, aliased_edge.input_id == entity_to_join.id, isouter=isouterjoin)
         return JoinReturn(new_query, aliased_edge)
 
+    def join_node_links(self, joined_id: ColumnElement, entity_to_join: Optional[AliasedClass],
+                        relationship: str) -> Tuple[JoinReturn, ColumnElement]:
+        """
+        :param joined_id: The id of the node that is joined, which can also be the column of a link referring to it
+        :param entity_to_join: The (aliased) ORMClass at the other end of the links, or None to only join the links
+        :param relationship: 'with_incoming' to join the outgoing links of the joined node,
+            'with_outgoing' to join its incoming links
+
+        **joined_id** and **entity_to_join** are joined with a link as in ``_join_node_outputs`` and
+        ``_join_node_inputs``. Since the columns of a link refer to existing nodes, the node at the other end of the
+        links does not have to be joined, if it is only used to join further links to it.
+
+        :return: the join and the column of the link that refers to the node at the other end
+        """
+        if relationship not in ('with_incoming', 'with_outgoing'):
+            raise ValueError(f"'{relationship}' is not a valid joining keyword to join links")
+        aliased_edge = aliased(self._entities.Link)
+        if relationship == 'with_incoming':
+            joined_column, node_id = aliased_edge.input_id, aliased_edge.output_id
+        else:
+            joined_column, node_id = aliased_edge.output_id, aliased_edge.input_id
+
+        join_links = lambda q: q.join(aliased_edge, joined_column == joined_id)
+        if entity_to_join is None:
+            new_query = join_links
+        else:
+            new_query = lambda q: join_links(q).join(entity_to_join, node_id == entity_to_join.id)
+        return JoinReturn(new_query, aliased_edge), node_id
+
     def _join_node_descendants_recursive(
         self, joined_entity, entity_to_join, isouterjoin: bool, filter_dict: FilterType, expand_path=False
     ):
@@ -9,31 +9,54 @@
 ###########################################################################
 # pylint: disable=too-many-lines
 """Sqla query builder implementation"""
+from collections import OrderedDict
 from contextlib import contextmanager, nullcontext
-from dataclasses import dataclass
-from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from operator import eq, ge, gt, le, lt
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple, Type, Union
 import uuid
 import warnings
+from weakref import WeakKeyDictionary
 
-from sqlalchemy import and_
+from sqlalchemy import and_, bindparam
+from sqlalchemy import cast as type_cast
 from sqlalchemy import func as sa_func
 from sqlalchemy import not_, or_
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.engine import Row
 from sqlalchemy.exc import CompileError, SAWarning
 from sqlalchemy.orm import aliased
 from sqlalchemy.orm.attributes import InstrumentedAttribute, QueryableAttribute
 from sqlalchemy.orm.query import Query
 from sqlalchemy.orm.session import Session
 from sqlalchemy.orm.util import AliasedClass
+from sqlalchemy.sql import visitors
 from sqlalchemy.sql.compiler import SQLCompiler
-from sqlalchemy.sql.elements import BinaryExpression, BooleanClauseList, Cast, ColumnClause, ColumnElement, Label
+from sqlalchemy.sql.elements import (
+    BinaryExpression,
+    BindParameter,
+    BooleanClauseList,
+    Case,
+    Cast,
+    ColumnClause,
+    ColumnElement,
+    Label,
+)
 from sqlalchemy.sql.expression import case, text
-from sqlalchemy.types import Boolean, DateTime, Float, Integer, String
+from sqlalchemy.types import Boolean, DateTime, Float, Integer, Numeric, String
 
 from aiida.common.exceptions import NotExistent
 from aiida.orm.entities import EntityTypes
-from aiida.orm.implementation.querybuilder import QUERYBUILD_LOGGER, BackendQueryBuilder, QueryDictType
+from aiida.orm.implementation.querybuilder import QUERYBUILD_LOGGER, BackendQueryBuilder, PathItemType, QueryDictType
+from aiida.storage.psql_dos.models.authinfo import DbAuthInfo
+from aiida.storage.psql_dos.models.comment import DbComment
+from aiida.storage.psql_dos.models.computer import DbComputer
+from aiida.storage.psql_dos.models.group import DbGroup, table_groups_nodes
+from aiida.storage.psql_dos.models.log import DbLog
+from aiida.storage.psql_dos.models.node import DbLink, DbNode
+from aiida.storage.psql_dos.models.user import DbUser
 
 from .joiner import JoinReturn, SqlaJoiner
 
@@ -41,6 +64,103 @@ jsonb_typeof = sa_func.jsonb_typeof
 jsonb_array_length = sa_func.jsonb_array_length
 array_length = sa_func.array_length
 
+#: the types of the columns that filters can be applied to, where ``Label`` is used because it is what is returned for
+#: the 'state' column by the hybrid_column construct
+VALID_COLUMN_TYPES = (Cast, InstrumentedAttribute, QueryableAttribute, Label, ColumnClause)
+
+#: mapping of the cast keys of projections and orderings to the type the text of a JSONB value is cast to
+JSONB_CAST_TYPES = MappingProxyType({'f': Float, 'i': Integer, 'b': Boolean, 'j': JSONB, 'd': DateTime})
+
+#: mapping of the function keys of projections to the SQL functions
+PROJECTION_FUNCTIONS = MappingProxyType({'max': sa_func.max, 'min': sa_func.min, 'count': sa_func.count})
+
+#: mapping of the filter operators on columns to the function that builds the expression from the column and the value
+COLUMN_OPERATORS: Mapping[str, Callable[[Any, Any], ColumnElement]] = MappingProxyType({
+    '==': eq,
+    '>': gt,
+    '<': lt,
+    '>=': ge,
+    '<=': le,
+    # the like operator expects a string, so we cast to avoid problems
+    # with fields like UUID, which don't support the like operator
+    'like': lambda column, value: column.cast(String).like(value),
+    'ilike': lambda column, value: column.ilike(value),
+    'in': lambda column, value: column.in_(value),
+})
+
+#: mapping of the filter operators on JSONB values that compare the value, cast according to the type of the filter
+#: value or of its first item for ``in``, to the function that builds the comparison from the cast value and the value
+JSONB_COMPARISON_OPERATORS: Mapping[str, Callable[[Any, Any], ColumnElement]] = MappingProxyType({
+    '==': eq,
+    '>': gt,
+    '<': lt,
+    '>=': ge,
+    '<=': le,
+    'like': lambda entity, value: entity.like(value),
+    'ilike': lambda entity, value: entity.ilike(value),
+    'in': lambda entity, value: entity.in_(value),
+})
+
+#: mapping of the filter operators on the length of JSONB arrays to the function that compares the length to the value
+JSONB_ARRAY_LENGTH_OPERATORS: Mapping[str, Callable[[Any, Any], ColumnElement]] = MappingProxyType({
+    'of_length': eq,
+    'longer': gt,
+    'shorter': lt,
+})
+
+#: the types of filter values on JSONB columns, in the order in which they are checked, since a ``bool`` is also an
+#: ``int``, with the corresponding JSON type and the type the text of the JSONB value is cast to, if any
+JSONB_VALUE_TYPES: Tuple[Tuple[Union[type, Tuple[type, ...]], str, Any], ...] = (
+    (bool, 'boolean', Boolean),
+    ((int, float), 'number', Float),
+    (str, 'string', None),
+    (list, 'array', JSONB),
+    (dict, 'object', JSONB),
+)
+
+#: mapping of the types of scalar filter values to the type they are cast to when building a JSONB object from them
+JSONB_SCALAR_TYPES = MappingProxyType({bool: Boolean, int: Numeric, float: Float, str: String})
+
+#: the filter operators that match the value against a string pattern
+PATTERN_OPERATORS = frozenset(('like', 'ilike'))
+
+#: mapping of the aliases of filter operators to the operator they are normalised to before building the expression
+OPERATOR_ALIASES = MappingProxyType({'=>': '>=', '=<': '<='})
+
+#: mapping of the logical connectors of filters, both as path specification and as operator on a field, to the function
+#: that combines their sub-expressions, where a connector can be negated by a leading ``~`` or ``!``
+BOOLEAN_OPERATORS: Mapping[str, Callable[..., ColumnElement]] = MappingProxyType({'and': and_, 'or': or_})
+
+#: conversions of the field names in the database to those used by the ``QueryBuilder``: table -> field -> field
+INNER_TO_OUTER_SCHEMA: Mapping[str, Mapping[str, str]] = MappingProxyType({
+    'db_dbauthinfo': MappingProxyType({'_metadata': 'metadata'}),
+    'db_dbcomputer': MappingProxyType({'_metadata': 'metadata'}),
+    'db_dblog': MappingProxyType({'_metadata': 'metadata'}),
+})
+
+#: conversions of the field names used by the ``QueryBuilder`` to those in the database: table -> field -> field
+OUTER_TO_INNER_SCHEMA: Mapping[str, Mapping[str, str]] = MappingProxyType({
+    table: MappingProxyType({
+        outer: inner for inner, outer in fields.items()
+    }) for table, fields in INNER_TO_OUTER_SCHEMA.items()
+})
+
+# the mapping of a table without field name conversions, shared to avoid creating an empty dictionary for every lookup
+_EMPTY_MAPPING: Mapping[str, str] = MappingProxyType({})
+
+#: the filters of a node that do not constrain the nodes, where the filter on the node type is the one that the
+#: ``QueryBuilder`` adds for ``orm.Node``, which matches all nodes
+UNCONSTRAINED_NODE_FILTERS: Tuple[Optional[Dict[str, Any]], ...] = (None, {}, {'node_type': {'like': '%'}})
+
+#: The maximum number of built queries that are cached by a single ``SqlaQueryBuilder`` instance
+QUERY_CACHE_SIZE = 8
+
+#: The maximum number of query templates that are cached for a single session
+QUERY_TEMPLATE_CACHE_SIZE = 32
+
+#: The types of projected column values that are returned as is, without trying to convert them to a backend entity
+RESULT_PASSTHROUGH_TYPES = frozenset((type(None), bool, int, float, str, dict, list, datetime))
+
 
 @dataclass
 class BuiltQuery:
@@ -48,6 +168,94 @@ class BuiltQuery:
     query: Query
     tag_to_alias: Dict[str, Optional[AliasedClass]]
     tag_to_projected: Dict[str, Dict[str, int]]
+    # whether a single entity is projected, in which case SQLA returns the model instance instead of a ``Row``
+    single_entity: bool = False
+    # mapping of bind parameter name -> index of the filter value, as returned by ``get_query_signature``
+    parameters: Dict[str, int] = field(default_factory=dict)
+    # the filter values that the query was built for
+    values: tuple = ()
+    # the query before the limit, offset and distinct settings are applied
+    core: Optional[Query] = None
+    # the limit, offset and distinct settings of the query
+    tail: Tuple[Optional[int], Optional[int], bool] = (None, None, False)
+    # list of tag -> list of (field name, projection index), with the field names as returned to the ``QueryBuilder``
+    tag_to_fields: List[Tuple[str, List[Tuple[str, int]]]] = field(default_factory=list)
+
+    def substitute(self, values: tuple, tail: Tuple[Optional[int], Optional[int], bool]) -> Optional['BuiltQuery']:
+        """Return the query for the given filter values and tail, or ``None`` if they cannot be substituted.
+
+        The values can only be substituted if all the values that differ are bound to a named parameter. The limit,
+        offset and distinct settings are applied anew to the core of the query.
+        """
+        if values == self.values and tail == self.tail:
+            return self
+        core = self.core if self.core is not None else self.query
+        if values != self.values:
+            bound = set(self.parameters.values())
+            for index, (value, current) in enumerate(zip(values, self.values)):
+                if index not in bound and value != current:
+                    return None
+            core = core.params(**{name: values[index] for name, index in self.parameters.items()})
+        return replace(self, query=apply_query_tail(core, *tail), values=values, core=core, tail=tail)
+
+    def with_session(self, session: Session) -> 'BuiltQuery':
+        """Return a copy of the query that is bound to the given session."""
+        core = self.core.with_session(session) if self.core is not None else None
+        return replace(self, query=self.query.with_session(session), core=core)
+
+
+class FilterParameters:
+    """Bind the values of the filters to named parameters, while building the filters of a query.
+
+    Each filter value is assigned the index of the value, as returned by ``get_query_signature``. If the expression
+    built for a filter contains the value in a single literal bind parameter, that parameter is replaced by one that is
+    named after the index, such that a new value can be substituted in the built query with ``Query.params``.
+    Otherwise, the value remains a literal of the query.
+    """
+
+    def __init__(self) -> None:
+        self.index = 0
+        self.names: Dict[str, int] = {}
+        # Whether to bind the values, if False the values are only counted
+        self.bind_values = True
+
+    def bind(self, expression: ColumnElement, value: Any) -> ColumnElement:
+        """Return the expression with the literal bind parameter of the value replaced by a named one.
+
+        A literal only holds the value if it has the same type, since ``False == 0`` and ``True == 1``. The defaults of
+        ``CASE`` expressions, such as the ``ELSE false`` of the type-guarded comparisons of JSON values, are constants
+        of the expression and are never bound. Otherwise, a boolean value, which a comparison renders as a constant
+        instead of a literal, would be mistaken for such a default.
+        """
+        index = self.index
+        self.index += 1
+        if not self.bind_values:
+            return expression
+
+        defaults = {id(element.else_) for element in visitors.iterate(expression) if isinstance(element, Case)}
+        literals = {
+            id(element): element
+            for element in visitors.iterate(expression)
+            if isinstance(element, BindParameter) and element.unique and id(element) not in defaults and
+            type(element.value) is type(value) and element.value == value
+        }
+        if len(literals) != 1:
+            return expression
+
+        literal = next(iter(literals.values()))
+        name = f'filter_{index}'
+        parameter = bindparam(name, literal.value, type_=literal.type, expanding=literal.expanding)
+        self.names[name] = index
+        return visitors.replacement_traverse(expression, {}, lambda element: parameter if element is literal else None)
+
+
+#: The templates of built queries, which are not bound to a session, shared by the ``SqlaQueryBuilder`` instances that
+#: use the same session. They are keyed weakly on the session, which is scoped to a thread, such that the templates are
+#: only used within the thread and are discarded together with the session.
+_QUERY_TEMPLATES: 'WeakKeyDictionary[Session, OrderedDict[tuple, BuiltQuery]]' = WeakKeyDictionary()
+
+#: The column names of a table, which are shared by all the aliases of the table
+_COLUMN_NAMES: 'WeakKeyDictionary[Any, List[str]]' = WeakKeyDictionary()
 
 
 class SqlaQueryBuilder(BackendQueryBuilder):
@@ -58,84 +266,58 @@ class SqlaQueryBuilder(BackendQueryBuilder):
 
     # pylint: disable=too-many-public-methods,invalid-name
 
+    # a ``QueryBuilder`` creates an instance for every query, so the instance attributes are stored in slots
+    __slots__ = ('_joiner', 'inner_to_outer_schema', 'outer_to_inner_schema', '_query_cache')
+
     def __init__(self, backend):
         super().__init__(backend)
 
         self._joiner = SqlaJoiner(self, self.build_filters)
 
-        # Set conversions between the field names in the database and used by the `QueryBuilder`
-        # table -> field -> field
-        self.inner_to_outer_schema: Dict[str, Dict[str, str]] = {
-            'db_dbauthinfo': {
-                '_metadata': 'metadata'
-            },
-            'db_dbcomputer': {
-                '_metadata': 'metadata'
-            },
-            'db_dblog': {
-                '_metadata': 'metadata'
-            },
-        }
-        self.outer_to_inner_schema: Dict[str, Dict[str, str]] = {
-            'db_dbauthinfo': {
-                'metadata': '_metadata'
-            },
-            'db_dbcomputer': {
-                'metadata': '_metadata'
-            },
-            'db_dblog': {
-                'metadata': '_metadata'
-            },
-        }
+        # Set conversions between the field names in the database and used by the `QueryBuilder`, which are static and
+        # so shared by all instances as read-only mappings
+        self.inner_to_outer_schema: Mapping[str, Mapping[str, str]] = INNER_TO_OUTER_SCHEMA
+        self.outer_to_inner_schema: Mapping[str, Mapping[str, str]] = OUTER_TO_INNER_SCHEMA
 
-        # Hashing the internal query representation avoids rebuilding a query
-        self._query_cache: Optional[BuiltQuery] = None
-        self._query_hash: Optional[str] = None
+        # Caching the built queries by the structural signature of the internal query representation avoids rebuilding
+        # a query. The filter values of a cached query are substituted through its bind parameters.
+        self._query_cache: 'OrderedDict[tuple, BuiltQuery]' = OrderedDict()
 
     @property
     def Node(self):
-        import aiida.storage.psql_dos.models.node
-        return aiida.storage.psql_dos.models.node.DbNode
+        return DbNode
 
     @property
     def Link(self):
-        import aiida.storage.psql_dos.models.node
-        return aiida.storage.psql_dos.models.node.DbLink
+        return DbLink
 
     @property
     def Computer(self):
-        import aiida.storage.psql_dos.models.computer
-        return aiida.storage.psql_dos.models.computer.DbComputer
+        return DbComputer
 
     @property
     def User(self):
-        import aiida.storage.psql_dos.models.user
-        return aiida.storage.psql_dos.models.user.DbUser
+        return DbUser
 
     @property
     def Group(self):
-        import aiida.storage.psql_dos.models.group
-        return aiida.storage.psql_dos.models.group.DbGroup
+        return DbGroup
 
     @property
     def AuthInfo(self):
-        import aiida.storage.psql_dos.models.authinfo
-        return aiida.storage.psql_dos.models.authinfo.DbAuthInfo
+        return DbAuthInfo
 
     @property
     def Comment(self):
-        import aiida.storage.psql_dos.models.comment
-        return aiida.storage.psql_dos.models.comment.DbComment
+        return DbComment
 
     @property
     def Log(self):
-        import aiida.storage.psql_dos.models.log
-        return aiida.storage.psql_dos.models.log.DbLog
+        return DbLog
 
     @property
     def table_groups_nodes(self):
-        import aiida.storage.psql_dos.models.group
-        return aiida.storage.psql_dos.models.group.table_groups_nodes
+        return table_groups_nodes
 
     def get_session(self) -> Session:
         """Get the connection to the database"""
@@ -155,17 +337,18 @@ class SqlaQueryBuilder(BackendQueryBuilder):
 
         # SQLA will return a Row, if only certain columns are requested,
         # or a database model if that is requested
-        if not isinstance(result, Row):
-            result = (result,)
+        if build.single_entity:
+            return [self.to_backend(result)]
 
-        return [self.to_backend(r) for r in result]
+        return list(map(self.to_backend, result))
 
     def iterall(self, data: QueryDictType, batch_size: Optional[int]) -> Iterable[List[Any]]:
         """Return an iterator over all the results of a list of lists."""
         with self.query_session(data) as build:
 
-            stmt = build.query.statement.execution_options(yield_per=batch_size)
+            stmt = get_iteration_statement(build.query, batch_size)
             session = self.get_session()
+            to_backend = self.to_backend
 
             # Open a session transaction unless already inside one. This prevents the `ModelWrapper` from calling commit
             # on the session when a yielded row is mutated. This would reset the cursor invalidating it and causing an
@@ -174,14 +357,16 @@ class SqlaQueryBuilder(BackendQueryBuilder):
             with nullcontext() if session.in_nested_transaction() else self._backend.transaction(
             ):  # type: ignore[attr-defined]
                 for resultrow in session.execute(stmt):
-                    yield [self.to_backend(rowitem) for rowitem in resultrow]
+                    yield list(map(to_backend, resultrow))
 
     def iterdict(self, data: QueryDictType, batch_size: Optional[int]) -> Iterable[Dict[str, Dict[str, Any]]]:
         """Return an iterator over all the results of a list of dictionaries."""
         with self.query_session(data) as build:
 
-            stmt = build.query.statement.execution_options(yield_per=batch_size)
+            stmt = get_iteration_statement(build.query, batch_size)
             session = self.get_session()
+            tag_to_fields = build.tag_to_fields
+            to_backend = self.to_backend
 
             # Open a session transaction unless already inside one. This prevents the `ModelWrapper` from calling commit
             # on the session when a yielded row is mutated. This would reset the cursor invalidating it and causing an
@@ -189,41 +374,45 @@ class SqlaQueryBuilder(BackendQueryBuilder):
             # See https://github.com/python/mypy/issues/10109 for the reason of the type warning.
             with nullcontext() if session.in_nested_transaction() else self._backend.transaction(
             ):  # type: ignore[attr-defined]
-                for row in self.get_session().execute(stmt):
+                for row in session.execute(stmt):
                     # build the yield result
-                    yield_result: Dict[str, Dict[str, Any]] = {}
-                    for (
-                        tag,
-                        projected_entities_dict,
-                    ) in build.tag_to_projected.items():
-                        yield_result[tag] = {}
-                        for attrkey, project_index in projected_entities_dict.items():
-                            alias = build.tag_to_alias.get(tag)
-                            if alias is None:
-                                raise ValueError(f'No alias found for tag {tag}')
-                            field_name = get_corresponding_property(
-                                get_table_name(alias),
-                                attrkey,
-                                self.inner_to_outer_schema,
-                            )
-                            yield_result[tag][field_name] = self.to_backend(row[project_index])
-                    yield yield_result
+                    yield {
+                        tag: {
+                            field_name: to_backend(row[project_index]) for field_name, project_index in fields
+                        } for tag, fields in tag_to_fields
+                    }
 
     def get_query(self, data: QueryDictType) -> BuiltQuery:
         """Return the built query.
 
-        To avoid unnecessary re-builds of the query, the hashed dictionary representation of this instance
-        is compared to the last query returned, which is cached by its hash.
-        """
-        from aiida.common.hashing import make_hash
+        To avoid unnecessary re-builds of the query, the structural signature of the dictionary representation is used
+        to look up the queries that were previously built by this instance, which are kept in a small LRU cache. The
+        filter values are substituted in a cached query through its bind parameters and the limit, offset and distinct
+        settings are reapplied to it, such that queries that only differ in those are not rebuilt, e.g. when paginating.
 
-        query_hash = make_hash(data)
+        Since a ``QueryBuilder`` typically only lives for a single query, the queries are built as templates that are
+        not bound to a session, which are also shared by the instances that use the same session. A query from such a
+        template is bound to the session of this instance.
+        """
+        signature, values = get_query_signature(data)
+        tail = (data['limit'], data['offset'], data['distinct'])
 
-        if not (self._query_cache and self._query_hash and self._query_hash == query_hash):
-            self._query_cache = self._build(data)
-            self._query_hash = query_hash
+        cached = self._query_cache.get(signature)
+        build = cached.substitute(values, tail) if cached is not None else None
 
-        return self._query_cache
+        if build is None:
+            session = self.get_session()
+            templates = _QUERY_TEMPLATES.setdefault(session, OrderedDict())
+            template = templates.get(signature)
+            template = template.substitute(values, tail) if template is not None else None
+            if template is None:
+                template = self._build(data)
+                template.values = values
+            _cache_query(templates, signature, template, QUERY_TEMPLATE_CACHE_SIZE)
+            build = template.with_session(session)
+
+        _cache_query(self._query_cache, signature, build, QUERY_CACHE_SIZE)
+        return build
 
     @contextmanager
     def query_session(self, data: QueryDictType) -> Iterator[BuiltQuery]:
@@ -261,7 +450,8 @@ class SqlaQueryBuilder(BackendQueryBuilder):
                 tag_to_alias[path['tag']] = aliased(cls_map[path['orm_base']])
 
         # now create joins first, so we can populate edge tag aliases
-        joins = generate_joins(data, tag_to_alias, self._joiner)
+        eliminated_tags = get_eliminated_tags(data)
+        joins = generate_joins(data, tag_to_alias, self._joiner, eliminated_tags)
         for join in joins:
             if join.aliased_edge is not None:
                 tag_to_alias[join.edge_tag] = join.aliased_edge
@@ -271,14 +461,9 @@ class SqlaQueryBuilder(BackendQueryBuilder):
             data, tag_to_alias, self.outer_to_inner_schema, self._get_projectable_entity
         )
 
-        # initialise the query
-        query = self.get_session().query()
-        # add the projections
-        for projection, is_entity in projections:
-            if is_entity:
-                query = query.add_entity(projection)
-            else:
-                query = query.add_columns(projection)
+        # initialise the query with the projections, entities and columns alike, at once, which is not bound to a
+        # session such that it can be shared as a template
+        query = Query([projection for projection, _ in projections])
         # and the starting table, from which joins will be made
         starting_table = tag_to_alias.get(data['path'][0]['tag'])
         if starting_table is None:
@@ -289,15 +474,24 @@ class SqlaQueryBuilder(BackendQueryBuilder):
         for join in joins:
             query = join.join(query)
 
-        # add the filters
+        # add the filters, the filters of tags that are used in a recursive join are also built into the join by
+        # the joiner, so their values cannot be bound to parameters of the query. The filters of eliminated tags are
+        # always true and are only built to keep the count of the filter values
+        parameters = FilterParameters()
+        recursive_tags = {
+            vertex['joining_value']
+            for vertex in data['path'][1:]
+            if vertex['joining_keyword'] in ('with_ancestors', 'with_descendants')
+        }
         for tag, filter_specs in data['filters'].items():
             if not filter_specs:
                 continue
             alias = tag_to_alias.get(tag)
             if not alias:
                 raise ValueError(f'Unknown tag {tag!r} in filters, known: {list(tag_to_alias)}')
-            filters = self.build_filters(alias, filter_specs)
-            if filters is not None:
+            parameters.bind_values = tag not in recursive_tags and tag not in eliminated_tags
+            filters = self.build_filters(alias, filter_specs, parameters)
+            if filters is not None and tag not in eliminated_tags:
                 query = query.filter(filters)
 
         # set the ordering
@@ -311,20 +505,25 @@ class SqlaQueryBuilder(BackendQueryBuilder):
                         query = query.order_by(self._create_order_by(alias, entitytag, entityspec))
 
         # final setup for the query
-        if data['limit'] is not None:
-            query = query.limit(data['limit'])
-        if data['offset'] is not None:
-            query = query.offset(data['offset'])
-        if data['distinct']:
-            query = query.distinct()
-
-        return BuiltQuery(query, tag_to_alias, tag_to_projected)
+        tail = (data['limit'], data['offset'], data['distinct'])
+
+        single_entity = len(projections) == 1 and projections[0][1]
+
+        return BuiltQuery(
+            apply_query_tail(query, *tail),
+            tag_to_alias,
+            tag_to_projected,
+            single_entity,
+            parameters.names,
+            core=query,
+            tail=tail,
+            tag_to_fields=generate_result_fields(tag_to_alias, tag_to_projected, self.inner_to_outer_schema),
+        )
 
     def _create_order_by(self, alias: AliasedClass, field_key: str,
                          entityspec: dict) -> Union[ColumnElement, InstrumentedAttribute]:
         """Build the order_by parameter of the query."""
-        column_name = field_key.split('.')[0]
-        attrpath = field_key.split('.')[1:]
+        column_name, *attrpath = field_key.split('.')
         if attrpath and 'cast' not in entityspec.keys():
             # JSONB fields ar delimited by '.' must be cast
             raise ValueError(
@@ -352,52 +551,38 @@ class SqlaQueryBuilder(BackendQueryBuilder):
 
         entity: ColumnElement = get_column(column_name, alias)[attrpath]
         if cast is None:
-            pass
-        elif cast == 'f':
-            entity = entity.astext.cast(Float)
-        elif cast == 'i':
-            entity = entity.astext.cast(Integer)
-        elif cast == 'b':
-            entity = entity.astext.cast(Boolean)
-        elif cast == 't':
-            entity = entity.astext
-        elif cast == 'j':
-            entity = entity.astext.cast(JSONB)
-        elif cast == 'd':
-            entity = entity.astext.cast(DateTime)
-        else:
+            return entity
+        if cast == 't':
+            return entity.astext
+        cast_type = JSONB_CAST_TYPES.get(cast)
+        if cast_type is None:
             raise ValueError(f'Unknown casting key {cast}')
-        return entity
+        return entity.astext.cast(cast_type)
 
-    def build_filters(self, alias: AliasedClass, filter_spec: Dict[str, Any]) -> Optional[BooleanClauseList]:  # pylint: disable=too-many-branches
+    def build_filters(  # pylint: disable=too-many-branches
+        self,
+        alias: AliasedClass,
+        filter_spec: Dict[str, Any],
+        parameters: Optional[FilterParameters] = None,
+    ) -> Optional[BooleanClauseList]:
         """Recurse through the filter specification and apply filter operations.
 
         :param alias: The alias of the ORM class the filter will be applied on
         :param filter_spec: the specification of the filter
+        :param parameters: optional collection of the bind parameters the filter values are bound to
 
         :returns: an sqlalchemy expression.
         """
         expressions: List[Any] = []
         for path_spec, filter_operation_dict in filter_spec.items():
-            if path_spec in ('and', 'or', '~or', '~and', '!and', '!or'):
-                subexpressions = []
-                for sub_filter_spec in filter_operation_dict:
-                    filters = self.build_filters(alias, sub_filter_spec)
-                    if filters is not None:
-                        subexpressions.append(filters)
-                if subexpressions:
-                    if path_spec == 'and':
-                        expressions.append(and_(*subexpressions))
-                    elif path_spec == 'or':
-                        expressions.append(or_(*subexpressions))
-                    elif path_spec in ('~and', '!and'):
-                        expressions.append(not_(and_(*subexpressions)))
-                    elif path_spec in ('~or', '!or'):
-                        expressions.append(not_(or_(*subexpressions)))
+            if _split_negation(path_spec)[1] in BOOLEAN_OPERATORS:
+                expression = self._build_connected_filters(alias, path_spec, filter_operation_dict, parameters)
+                if expression is not None:
+                    expressions.append(expression)
             else:
-                column_name = path_spec.split('.')[0]
-
-                attr_key = path_spec.split('.')[1:]
+                column_name, *attr_path = path_spec.split('.')
+                # the path is passed down as a tuple, as which it indexes the JSONB column, also in nested operations
+                attr_key = tuple(attr_path)
                 is_jsonb = bool(attr_key) or column_name in ('attributes', 'extras')
                 column: Optional[InstrumentedAttribute]
                 try:
@@ -419,19 +604,43 @@ class SqlaQueryBuilder(BackendQueryBuilder):
                             column=column,
                             column_name=column_name,
                             alias=alias,
+                            parameters=parameters,
                         )
                     )
         return and_(*expressions) if expressions else None
 
+    def _build_connected_filters(
+        self,
+        alias: AliasedClass,
+        path_spec: str,
+        filter_specs: List[Dict[str, Any]],
+        parameters: Optional[FilterParameters],
+    ) -> Optional[ColumnElement]:
+        """Return the expression that combines the filters of a logical path specification, such as ``and`` or ``~or``.
+
+        :returns: the combined expression, or ``None`` if none of the filters results in an expression.
+        """
+        negation, connector = _split_negation(path_spec)
+        subexpressions = []
+        for sub_filter_spec in filter_specs:
+            filters = self.build_filters(alias, sub_filter_spec, parameters)
+            if filters is not None:
+                subexpressions.append(filters)
+        if not subexpressions:
+            return None
+        expression = BOOLEAN_OPERATORS[connector](*subexpressions)
+        return not_(expression) if negation else expression
+
     def get_filter_expr(
         self,
         operator: str,
         value: Any,
-        attr_key: List[str],
+        attr_key: Sequence[str],
         is_jsonb: bool,
         alias=None,
         column=None,
         column_name=None,
+        parameters: Optional[FilterParameters] = None,
     ):
         """Applies a filter on the alias given.
 
@@ -448,11 +657,18 @@ class SqlaQueryBuilder(BackendQueryBuilder):
 
         :param is_jsonb: Whether the value is in a json-column, or in an attribute like table.
 
+        :param parameters: Optional collection of the bind parameters the filter values are bound to.
 
         Implemented and valid operators:
 
         *   for any type:
             *   ==  (compare single value, eg: '==':5.0)
+
+                .. note::
+                    For a string, number or boolean in a JSONB column, e.g. ``'attributes.key': 5.0``, the comparison
+                    is a containment (``@>``) check, which can use a GIN index on the column, such as:
+                    ``CREATE INDEX ON db_dbnode USING GIN (attributes jsonb_path_ops)``
+
             *   in    (compare whether in list, eg: 'in':[5, 6, 34]
         *  for floats and integers:
             *   >
@@ -508,49 +724,41 @@ class SqlaQueryBuilder(BackendQueryBuilder):
         """
         # pylint: disable=too-many-arguments, too-many-branches
         expr: Any = None
-        if operator.startswith('~'):
-            negation = True
-            operator = operator.lstrip('~')
-        elif operator.startswith('!'):
-            negation = True
-            operator = operator.lstrip('!')
-        else:
-            negation = False
-        if operator in ('longer', 'shorter', 'of_length'):
+        negation, operator = _split_negation(operator)
+        operator = OPERATOR_ALIASES.get(operator, operator)
+        if operator in JSONB_ARRAY_LENGTH_OPERATORS:
             if not isinstance(value, int):
                 raise TypeError('You have to give an integer when comparing to a length')
-        elif operator in ('like', 'ilike'):
+        elif operator in PATTERN_OPERATORS:
             if not isinstance(value, str):
                 raise TypeError(f'Value for operator {operator} has to be a string (you gave {value})')
 
         elif operator == 'in':
             try:
-                value_type_set = set(type(i) for i in value)
+                item_type, is_uniform = _get_item_type(value)
             except TypeError:
                 raise TypeError('Value for operator `in` could not be iterated')
-            if not value_type_set:
+            if item_type is None:
                 raise ValueError('Value for operator `in` is an empty list')
-            if len(value_type_set) > 1:
+            if not is_uniform:
                 raise ValueError(f'Value for operator `in` contains more than one type: {value}')
-        elif operator in ('and', 'or'):
-            expressions_for_this_path = []
-            for filter_operation_dict in value:
-                for newoperator, newvalue in filter_operation_dict.items():
-                    expressions_for_this_path.append(
-                        self.get_filter_expr(
-                            newoperator,
-                            newvalue,
-                            attr_key=attr_key,
-                            is_jsonb=is_jsonb,
-                            alias=alias,
-                            column=column,
-                            column_name=column_name,
-                        )
-                    )
-            if operator == 'and':
-                expr = and_(*expressions_for_this_path)
-            elif operator == 'or':
-                expr = or_(*expressions_for_this_path)
+        elif operator in BOOLEAN_OPERATORS:
+            if column is None and alias is not None and column_name is not None:
+                # resolve the column once for all the operations, instead of for each of them
+                column = get_column(column_name, alias)
+            expressions_for_this_path = [
+                self.get_filter_expr(
+                    newoperator,
+                    newvalue,
+                    attr_key=attr_key,
+                    is_jsonb=is_jsonb,
+                    alias=alias,
+                    column=column,
+                    column_name=column_name,
+                    parameters=parameters,
+                ) for newoperator, newvalue in _flatten_operations(operator, value)
+            ]
+            expr = BOOLEAN_OPERATORS[operator](*expressions_for_this_path)
 
         if expr is None:
             if is_jsonb:
@@ -568,6 +776,8 @@ class SqlaQueryBuilder(BackendQueryBuilder):
                         raise RuntimeError('I need to get the column but do not know the alias and the column name')
                     column = get_column(column_name, alias)
                 expr = self.get_filter_expr_from_column(operator, value, column)
+            if parameters is not None:
+                expr = parameters.bind(expr, value)
 
         if negation:
             return not_(expr)
@@ -577,7 +787,7 @@ class SqlaQueryBuilder(BackendQueryBuilder):
     def get_filter_expr_from_jsonb(
         operator: str,
         value,
-        attr_key: List[str],
+        attr_key: Sequence[str],
         column=None,
         column_name=None,
         alias=None,
@@ -588,48 +798,29 @@ class SqlaQueryBuilder(BackendQueryBuilder):
 
         def cast_according_to_type(path_in_json, value):
             """Cast the value according to the type"""
-            if isinstance(value, bool):
-                type_filter = jsonb_typeof(path_in_json) == 'boolean'
-                casted_entity = path_in_json.astext.cast(Boolean)
-            elif isinstance(value, (int, float)):
-                type_filter = jsonb_typeof(path_in_json) == 'number'
-                casted_entity = path_in_json.astext.cast(Float)
-            elif isinstance(value, dict) or value is None:
-                type_filter = jsonb_typeof(path_in_json) == 'object'
-                casted_entity = path_in_json.astext.cast(JSONB)  # BOOLEANS?
-            elif isinstance(value, dict):
-                type_filter = jsonb_typeof(path_in_json) == 'array'
-                casted_entity = path_in_json.astext.cast(JSONB)  # BOOLEANS?
-            elif isinstance(value, str):
-                type_filter = jsonb_typeof(path_in_json) == 'string'
-                casted_entity = path_in_json.astext
-            elif value is None:
-                type_filter = jsonb_typeof(path_in_json) == 'null'
-                casted_entity = path_in_json.astext.cast(JSONB)  # BOOLEANS?
-            else:
-                raise TypeError(f'Unknown type {type(value)}')
-            return type_filter, casted_entity
+            if value is None:
+                return jsonb_typeof(path_in_json) == 'null', path_in_json.astext.cast(JSONB)
+            for value_type, json_type, cast_type in JSONB_VALUE_TYPES:
+                if isinstance(value, value_type):
+                    casted_entity = path_in_json.astext if cast_type is None else path_in_json.astext.cast(cast_type)
+                    return jsonb_typeof(path_in_json) == json_type, casted_entity
+            raise TypeError(f'Unknown type {type(value)}')
 
         if column is None:
             column = get_column(column_name, alias)
 
         database_entity = column[tuple(attr_key)]
+        comparison = JSONB_COMPARISON_OPERATORS.get(operator)
         expr: Any
-        if operator == '==':
-            type_filter, casted_entity = cast_according_to_type(database_entity, value)
-            expr = case((type_filter, casted_entity == value), else_=False)
-        elif operator == '>':
-            type_filter, casted_entity = cast_according_to_type(database_entity, value)
-            expr = case((type_filter, casted_entity > value), else_=False)
-        elif operator == '<':
-            type_filter, casted_entity = cast_according_to_type(database_entity, value)
-            expr = case((type_filter, casted_entity < value), else_=False)
-        elif operator in ('>=', '=>'):
-            type_filter, casted_entity = cast_according_to_type(database_entity, value)
-            expr = case((type_filter, casted_entity >= value), else_=False)
-        elif operator in ('<=', '=<'):
-            type_filter, casted_entity = cast_according_to_type(database_entity, value)
-            expr = case((type_filter, casted_entity <= value), else_=False)
+        if operator == '==' and attr_key and type(value) in JSONB_SCALAR_TYPES and not any(
+            key.lstrip('-').isdigit() for key in attr_key
+        ):
+            # a path with integer keys could also index arrays, which a containment check does not
+            expr = get_jsonb_containment(column, attr_key, value)
+        elif comparison is not None:
+            sample = value[0] if operator == 'in' else value
+            type_filter, casted_entity = cast_according_to_type(database_entity, sample)
+            expr = case((type_filter, comparison(casted_entity, value)), else_=False)
         elif operator == 'of_type':
             # http://www.postgresql.org/docs/9.5/static/functions-json.html
             #  Possible types are object, array, string, number, boolean, and null.
@@ -637,41 +828,15 @@ class SqlaQueryBuilder(BackendQueryBuilder):
             if value not in valid_types:
                 raise ValueError(f'value {value} for of_type is not among valid types\n{valid_types}')
             expr = jsonb_typeof(database_entity) == value
-        elif operator == 'like':
-            type_filter, casted_entity = cast_according_to_type(database_entity, value)
-            expr = case((type_filter, casted_entity.like(value)), else_=False)
-        elif operator == 'ilike':
-            type_filter, casted_entity = cast_according_to_type(database_entity, value)
-            expr = case((type_filter, casted_entity.ilike(value)), else_=False)
-        elif operator == 'in':
-            type_filter, casted_entity = cast_according_to_type(database_entity, value[0])
-            expr = case((type_filter, casted_entity.in_(value)), else_=False)
         elif operator == 'contains':
             expr = database_entity.cast(JSONB).contains(value)
         elif operator == 'has_key':
             expr = database_entity.cast(JSONB).has_key(value)  # noqa
-        elif operator == 'of_length':
-            expr = case(
-                (
-                    jsonb_typeof(database_entity) == 'array',
-                    jsonb_array_length(database_entity.cast(JSONB)) == value,
-                ),
-                else_=False,
-            )
-
-        elif operator == 'longer':
-            expr = case(
-                (
-                    jsonb_typeof(database_entity) == 'array',
-                    jsonb_array_length(database_entity.cast(JSONB)) > value,
-                ),
-                else_=False,
-            )
-        elif operator == 'shorter':
+        elif operator in JSONB_ARRAY_LENGTH_OPERATORS:
             expr = case(
                 (
                     jsonb_typeof(database_entity) == 'array',
-                    jsonb_array_length(database_entity.cast(JSONB)) < value,
+                    JSONB_ARRAY_LENGTH_OPERATORS[operator](jsonb_array_length(database_entity.cast(JSONB)), value),
                 ),
                 else_=False,
             )
@@ -688,35 +853,12 @@ class SqlaQueryBuilder(BackendQueryBuilder):
         :param column: an instance of sqlalchemy.orm.attributes.InstrumentedAttribute or
 
         """
-        # Label is used because it is what is returned for the
-        # 'state' column by the hybrid_column construct
-        if not isinstance(
-            column,
-            (Cast, InstrumentedAttribute, QueryableAttribute, Label, ColumnClause),
-        ):
+        if not isinstance(column, VALID_COLUMN_TYPES):
             raise TypeError(f'column ({type(column)}) {column} is not a valid column')
-        database_entity = column
-        if operator == '==':
-            expr = database_entity == value
-        elif operator == '>':
-            expr = database_entity > value
-        elif operator == '<':
-            expr = database_entity < value
-        elif operator == '>=':
-            expr = database_entity >= value
-        elif operator == '<=':
-            expr = database_entity <= value
-        elif operator == 'like':
-            # the like operator expects a string, so we cast to avoid problems
-            # with fields like UUID, which don't support the like operator
-            expr = database_entity.cast(String).like(value)
-        elif operator == 'ilike':
-            expr = database_entity.ilike(value)
-        elif operator == 'in':
-            expr = database_entity.in_(value)
-        else:
+        build_expression = COLUMN_OPERATORS.get(operator)
+        if build_expression is None:
             raise ValueError(f'Unknown operator {operator} for filters on columns')
-        return expr
+        return build_expression(column, value)
 
     def to_backend(self, res) -> Any:
         """Convert results to return backend specific objects.
@@ -728,6 +870,9 @@ class SqlaQueryBuilder(BackendQueryBuilder):
 
         :returns:backend compatible instance
         """
+        if type(res) in RESULT_PASSTHROUGH_TYPES:
+            return res
+
         if isinstance(res, uuid.UUID):
             return str(res)
 
@@ -740,9 +885,10 @@ class SqlaQueryBuilder(BackendQueryBuilder):
         """Return the SQL query as a string."""
         with self.query_session(data) as build:
             compiled = compile_query(build.query, literal_binds=inline)
+        sql = compiled.string
         if inline:
-            return compiled.string + '\n'
-        return f'{compiled.string!r} % {compiled.params!r}\n'
+            return sql + '\n'
+        return f'{sql!r} % {compiled.params!r}\n'
 
     def analyze_query(self, data: QueryDictType, execute: bool = True, verbose: bool = False) -> str:
         """Analyze the query and return the result as a string."""
@@ -752,8 +898,8 @@ class SqlaQueryBuilder(BackendQueryBuilder):
             compiled = compile_query(build.query, literal_binds=True)
         options = ', '.join((['ANALYZE'] if execute else []) + (['VERBOSE'] if verbose else []))
         options = f' ({options})' if options else ''
-        rows = (self.get_session().execute(text(f'EXPLAIN{options} {compiled.string}')).fetchall())
-        return '\n'.join(row[0] for row in rows)
+        result = self.get_session().execute(text(f'EXPLAIN{options} {compiled.string}'))
+        return '\n'.join(result.scalars())
 
     def get_creation_statistics(self, user_pk: Optional[int] = None) -> Dict[str, Any]:
         session = self.get_session()
@@ -787,26 +933,18 @@ class SqlaQueryBuilder(BackendQueryBuilder):
         # Still not containing all dates
 
 
-def get_corresponding_property(entity_table: str, given_property: str, mapper: Dict[str, Dict[str, str]]) -> str:
+def get_corresponding_property(entity_table: str, given_property: str, mapper: Mapping[str, Mapping[str, str]]) -> str:
     """
     This method returns an updated property for a given a property.
     If there is no update for the property, the given property is returned.
     """
-    try:
-        # Get the mapping for the specific entity_table
-        property_mapping = mapper[entity_table]
-        try:
-            # Get the mapping for the specific property
-            return property_mapping[given_property]
-        except KeyError:
-            # If there is no mapping, the property remains unchanged
-            return given_property
-    except KeyError:
-        # If it doesn't exist, it means that the given_property remains v
-        return given_property
+    # If there is no mapping for the table or the property, which is the common case, the property remains unchanged
+    return mapper.get(entity_table, _EMPTY_MAPPING).get(given_property, given_property)
 
 
-def get_corresponding_properties(entity_table: str, given_properties: List[str], mapper: Dict[str, Dict[str, str]]):
+def get_corresponding_properties(
+    entity_table: str, given_properties: List[str], mapper: Mapping[str, Mapping[str, str]]
+):
     """
     This method returns a list of updated properties for a given list of properties.
     If there is no update for the property, the given property is returned in the list.
@@ -842,9 +980,25 @@ def modify_expansions(
     return expansions
 
 
+def get_jsonb_containment(column: InstrumentedAttribute, attr_key: Sequence[str], value: Any) -> ColumnElement:
+    """Return the expression that checks whether the JSONB column contains the scalar value at the given path.
+
+    The JSONB object ``{key1: {key2: value}}`` is built in the database, such that the value remains a single bind
+    parameter. Contrary to extracting and casting the value at the path, the containment operator ``@>`` can use a
+    ``jsonb_ops`` or ``jsonb_path_ops`` GIN index on the column.
+    """
+    contained = type_cast(value, JSONB_SCALAR_TYPES[type(value)])
+    for key in reversed(attr_key):
+        contained = sa_func.jsonb_build_object(key, contained)
+    return column.contains(contained)
+
+
 def get_column(colname: str, alias: AliasedClass) -> InstrumentedAttribute:
     """
     Return the column for a given projection.
+
+    The lookup is not cached here, since the ``AliasedClass`` already sets the adapted attribute on itself the first
+    time it is accessed, such that subsequent lookups of the same column on the same alias are plain attribute lookups.
     """
     try:
         return getattr(alias, colname)
@@ -859,23 +1013,55 @@ def get_column(colname: str, alias: AliasedClass) -> InstrumentedAttribute:
 def get_column_names(alias: AliasedClass) -> List[str]:
     """
     Given the backend specific alias, return the column names that correspond to the aliased table.
+
+    The names are computed once per table, the returned list should therefore not be modified.
     """
-    return [str(c).replace(f'{alias.__table__.name}.', '') for c in alias.__table__.columns]
+    table = alias.__table__
+    column_names = _COLUMN_NAMES.get(table)
+    if column_names is None:
+        column_names = _COLUMN_NAMES[table] = [c.name for c in table.columns]
+    return column_names
 
 
 def get_table_name(aliased_class: AliasedClass) -> str:
-    """ Returns the table name given an Aliased class"""
+    """ Returns the table name given an Aliased class
+
+    The name is not memoized: the aliases are created anew for every built query, which only looks up the table name of
+    each alias once, when resolving the names of its projected fields.
+    """
     return aliased_class.__tablename__
 
 
-def compile_query(query: Query, literal_binds: bool = False) -> SQLCompiler:
-    """Compile the query to the SQL executable.
+def apply_query_tail(query: Query, limit: Optional[int], offset: Optional[int], distinct: bool) -> Query:
+    """Return the query with the limit, offset and distinct settings applied."""
+    if limit is not None:
+        query = query.limit(limit)
+    if offset is not None:
+        query = query.offset(offset)
+    if distinct:
+        query = query.distinct()
+    return query
 
-    :params literal_binds: Inline bound parameters (this is normally handled by the Python DBAPI).
+
+def get_iteration_statement(query: Query, batch_size: Optional[int]):
+    """Return the statement to iterate over the results of the query.
+
+    If a batch size is given, the results are streamed from a server-side cursor in batches of that size, such that only
+    a single batch is held in memory. Otherwise, all the results are fetched at once.
     """
-    dialect = query.session.bind.dialect  # type: ignore[union-attr]
+    if batch_size is None:
+        return query.statement
+    return query.statement.execution_options(stream_results=True, yield_per=batch_size, max_row_buffer=batch_size)
+
 
-    class _Compiler(dialect.statement_compiler):  # type: ignore[name-defined]
+@lru_cache(maxsize=4)
+def _compiler_for(dialect_cls: type) -> Type[SQLCompiler]:
+    """Return the statement compiler of the dialect, extended with additional literal value renderers.
+
+    The subclass is created once per dialect class, rather than for each compiled query.
+    """
+
+    class _Compiler(dialect_cls.statement_compiler):  # type: ignore[name-defined]
         """Override the compiler with additional literal value renderers."""
 
         def render_literal_value(self, value, type_):
@@ -883,8 +1069,6 @@ def compile_query(query: Query, literal_binds: bool = False) -> SQLCompiler:
 
             See https://www.postgresql.org/docs/current/functions-json.html for serialisation specs
             """
-            from datetime import date, datetime, timedelta
-
             try:
                 return super().render_literal_value(value, type_)
             # sqlalchemy<1.4.45 raises NotImplementedError, sqlalchemy>=1.4.45 raises CompileError
@@ -899,20 +1083,176 @@ def compile_query(query: Query, literal_binds: bool = False) -> SQLCompiler:
                     return f'"{escaped}"'
                 raise
 
-    return _Compiler(dialect, query.statement, compile_kwargs=dict(literal_binds=literal_binds))
+    return _Compiler
+
+
+def compile_query(query: Query, literal_binds: bool = False) -> SQLCompiler:
+    """Compile the query to the SQL executable.
+
+    :params literal_binds: Inline bound parameters (this is normally handled by the Python DBAPI).
+    """
+    dialect = query.session.bind.dialect  # type: ignore[union-attr]
+    return _compiler_for(type(dialect))(dialect, query.statement, compile_kwargs=dict(literal_binds=literal_binds))
+
+
+def _split_negation(operator: str) -> Tuple[bool, str]:
+    """Split an operator into whether it is negated, by a leading ``~`` or ``!``, and the operator without negation."""
+    if operator[:1] in ('~', '!'):
+        return True, operator[1:]
+    return False, operator
+
+
+def _iter_operations(filter_operation_dicts: Iterable[Dict[str, Any]]) -> Iterator[Tuple[str, Any]]:
+    """Return an iterator over the (operator, value) pairs of a list of filter operation dictionaries."""
+    return (operation for operations in filter_operation_dicts for operation in operations.items())
+
+
+def _flatten_operations(connector: str, filter_operation_dicts: Iterable[Dict[str, Any]]) -> Iterator[Tuple[str, Any]]:
+    """Yield the (operator, value) pairs combined by the ``and`` or ``or`` connector, in order.
+
+    Nested operations with the same connector are flattened into the same clause, iteratively instead of recursively.
+    The stack holds the iterators over the operations of each level, such that they are yielded depth first.
+    """
+    stack = [_iter_operations(filter_operation_dicts)]
+    while stack:
+        for operator, value in stack[-1]:
+            if operator == connector and isinstance(value, (list, tuple)):
+                stack.append(_iter_operations(value))
+                break
+            yield operator, value
+        else:
+            stack.pop()
+
+
+def _cache_query(cache: 'OrderedDict[tuple, BuiltQuery]', signature: tuple, build: BuiltQuery, size: int) -> None:
+    """Store the built query as the most recently used entry of the LRU cache, evicting the oldest beyond the size."""
+    cache[signature] = build
+    cache.move_to_end(signature)
+    if len(cache) > size:
+        cache.popitem(last=False)
+
+
+def get_query_signature(data: QueryDictType) -> Tuple[tuple, tuple]:
+    """Return the structural signature of the query and the values of its filters.
 
+    The signature is a hashable representation of everything that determines the structure of the built query: the
+    path, the shape of the filters, the projections and the ordering. The values of the filters are not part of the
+    signature, but are returned separately, in the order in which the filters are built. The final limit, offset and
+    distinct settings are not part of the signature either, since they are applied to the query after it is built.
+    """
+    values: List[Any] = []
+    path = tuple((
+        vertex['tag'],
+        vertex['orm_base'],
+        vertex.get('joining_keyword'),
+        vertex.get('joining_value'),
+        vertex.get('outerjoin'),
+        vertex.get('edge_tag'),
+    ) for vertex in data['path'])
+    filters = tuple((tag, _get_filter_signature(filter_spec, values)) for tag, filter_spec in data['filters'].items())
+    signature = (
+        path,
+        filters,
+        _freeze(data['project']),
+        _freeze(data['order_by']),
+    )
+    return signature, tuple(values)
+
+
+def _get_filter_signature(filter_spec: Dict[str, Any], values: List[Any]) -> tuple:
+    """Return the signature of a filter specification, appending the filter values to ``values``.
+
+    This mirrors the recursion of ``SqlaQueryBuilder.build_filters`` and ``SqlaQueryBuilder.get_filter_expr``.
+    """
+    signature = []
+    for path_spec, filter_operation_dict in filter_spec.items():
+        if _split_negation(path_spec)[1] in BOOLEAN_OPERATORS:
+            signature.append((path_spec, tuple(_get_filter_signature(spec, values) for spec in filter_operation_dict)))
+        else:
+            if not isinstance(filter_operation_dict, dict):
+                filter_operation_dict = {'==': filter_operation_dict}
+            signature.append((path_spec, _get_operations_signature(filter_operation_dict, values)))
+    return tuple(signature)
+
+
+def _get_operations_signature(filter_operation_dict: Dict[str, Any], values: List[Any]) -> tuple:
+    """Return the signature of the operations on a single field, appending the filter values to ``values``."""
+    signature = []
+    for operator, value in filter_operation_dict.items():
+        if _split_negation(operator)[1] in BOOLEAN_OPERATORS and isinstance(value, (list, tuple)) and all(
+            isinstance(operations, dict) for operations in value
+        ):
+            signature.append((operator, tuple(_get_operations_signature(operations, values) for operations in value)))
+        else:
+            signature.append((operator, _get_value_signature(operator, value)))
+            values.append(value)
+    return tuple(signature)
+
+
+def _get_value_signature(operator: str, value: Any) -> Any:
+    """Return the signature of a filter value, which determines the expression that is built for the value.
+
+    Besides the type of the value, this includes the type of the items of sequences and whether it is shared by all the
+    items, which is validated for the ``in`` operator, and the value itself for ``of_type``, which is validated against
+    the valid type names.
+    """
+    operator = _split_negation(operator)[1]
+    if operator == 'of_type':
+        return value
+    if operator == 'in' or isinstance(value, (list, tuple)):
+        try:
+            return (type(value),) + _get_item_type(value)
+        except TypeError:
+            pass
+    return type(value)
+
+
+def _get_item_type(value: Iterable[Any]) -> Tuple[Optional[type], bool]:
+    """Return the type of the first item of the iterable, or ``None`` if it is empty, and whether all items share it.
+
+    The items are only iterated until the first one with a different type.
+
+    :raises TypeError: if the value is not iterable.
+    """
+    items = iter(value)
+    for first in items:
+        item_type = type(first)
+        # the exact type is compared, since ``isinstance`` would not tell a ``bool`` from an ``int``
+        return item_type, all(type(item) is item_type for item in items)  # pylint: disable=unidiomatic-typecheck
+    return None, True
+
+
+def _freeze(value: Any) -> Any:
+    """Return a hashable representation of a structure of nested dictionaries and lists."""
+    if isinstance(value, dict):
+        return tuple((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
 
-def generate_joins(data: QueryDictType, aliases: Dict[str, Optional[AliasedClass]],
-                   joiner: SqlaJoiner) -> List[JoinReturn]:
-    """Generate the joins for the query."""
+
+def generate_joins(
+    data: QueryDictType,
+    aliases: Dict[str, Optional[AliasedClass]],
+    joiner: SqlaJoiner,
+    eliminated_tags: Optional[Set[str]] = None,
+) -> List[JoinReturn]:
+    """Generate the joins for the query.
+
+    :param eliminated_tags: the tags of the nodes that are represented by the links they are joined with only, as
+        returned by ``get_eliminated_tags``
+    """
+    eliminated_tags = eliminated_tags or set()
+    # mapping of eliminated tag -> column of the link that refers to the node
+    node_ids: Dict[str, ColumnElement] = {}
     joins: List[JoinReturn] = []
     # Start on second path item, since there is nothing to join if that is the first table
-    for index, verticespec in enumerate(data['path'][1:], start=1):
+    for verticespec in get_join_order(data['path']):
         join_to = aliases[verticespec['tag']]
         if join_to is None:
             raise ValueError(f'No alias found for tag {verticespec["tag"]}')
 
-        calling_entity = data['path'][index]['orm_base']
+        calling_entity = verticespec['orm_base']
         joining_keyword = verticespec['joining_keyword']
         joining_value = verticespec['joining_value']
         try:
@@ -929,6 +1269,18 @@ def generate_joins(data: QueryDictType, aliases: Dict[str, Optional[AliasedClass
 
         edge_tag = verticespec['edge_tag']
 
+        if verticespec['tag'] in eliminated_tags or joining_value in node_ids:
+            join, node_id = joiner.join_node_links(
+                node_ids.get(joining_value, join_tag.id),
+                None if verticespec['tag'] in eliminated_tags else join_to,
+                joining_keyword,
+            )
+            if verticespec['tag'] in eliminated_tags:
+                node_ids[verticespec['tag']] = node_id
+            join.edge_tag = edge_tag
+            joins.append(join)
+            continue
+
         # if verticespec['joining_keyword'] in ('with_ancestors', 'with_descendants'):
         # These require a filter_dict, to help the recursive function find a good starting point.
         filter_dict = data['filters'].get(verticespec['joining_value'], {})
@@ -949,6 +1301,81 @@ def generate_joins(data: QueryDictType, aliases: Dict[str, Optional[AliasedClass
     return joins
 
 
+def get_join_order(path: List[PathItemType]) -> List[PathItemType]:
+    """Return the vertices of the path that have to be joined, in the order in which to join them.
+
+    Each vertex is joined after the vertex it is joined with, such that every join has a predicate on a table that is
+    already part of the query. The order of the path is kept where possible, which is always the case for the paths
+    built by the ``QueryBuilder``. If some vertices are not connected to the first one, they are joined last in their
+    original order and a warning is logged, since the database has to build the cartesian product of those tables.
+    """
+    joined = {path[0]['tag']}
+    remaining = list(path[1:])
+    ordered: List[PathItemType] = []
+    while remaining:
+        for index, vertex in enumerate(remaining):
+            if vertex['joining_value'] in joined:
+                break
+        else:
+            QUERYBUILD_LOGGER.warning(
+                'The tags %s of the path are not joined to the starting tag %r',
+                [vertex['tag'] for vertex in remaining],
+                path[0]['tag'],
+            )
+            ordered.extend(remaining)
+            break
+        if index:
+            QUERYBUILD_LOGGER.debug('Joining tag %r before the preceding tags of the path', remaining[index]['tag'])
+        vertex = remaining.pop(index)
+        joined.add(vertex['tag'])
+        ordered.append(vertex)
+    return ordered
+
+
+def get_eliminated_tags(data: QueryDictType) -> Set[str]:
+    """Return the tags of the intermediate nodes of the path whose table does not have to be joined.
+
+    A node that is only used to connect two other nodes through links is represented by the links alone: it has to be
+    joined through a link with a single node and another single node has to be joined through a link with it, without
+    outer joins, and it cannot be projected, ordered by or filtered on, except for the filter on the node type that
+    matches all nodes. Since the columns of a link refer to existing nodes, joining the table of such a node does not
+    change the results of the query.
+    """
+    link_keywords = ('with_incoming', 'with_outgoing')
+    ordered_tags = {tag for order_spec in data['order_by'] for tag in order_spec}
+    projected_tags = {tag for tag, projections in data['project'].items() if projections}
+    if not projected_tags:
+        # the last vertex is projected by default
+        projected_tags.add(data['path'][-1]['tag'])
+
+    joined_with: Dict[str, List[PathItemType]] = {}
+    for vertex in data['path'][1:]:
+        joined_with.setdefault(vertex['joining_value'], []).append(vertex)
+
+    def is_inner_link(vertex: PathItemType) -> bool:
+        """Return whether the vertex is joined through a link, without an outer join."""
+        return vertex['joining_keyword'] in link_keywords and not vertex.get('outerjoin')
+
+    def is_unreferenced(tag: str) -> bool:
+        """Return whether the tag is neither projected nor ordered by."""
+        return tag not in projected_tags and tag not in ordered_tags
+
+    def is_unfiltered(tag: str) -> bool:
+        """Return whether the tag has no filters that constrain the nodes."""
+        return data['filters'].get(tag) in UNCONSTRAINED_NODE_FILTERS
+
+    eliminated = set()
+    for vertex in data['path'][1:]:
+        tag = vertex['tag']
+        joined = joined_with.get(tag, [])
+        # the node has to connect the link it is joined through with a single other link
+        if vertex['orm_base'] != 'node' or len(joined) != 1:
+            continue
+        if is_inner_link(vertex) and is_inner_link(joined[0]) and is_unreferenced(tag) and is_unfiltered(tag):
+            eliminated.add(tag)
+    return eliminated
+
+
 def generate_projections(
     data: QueryDictType, aliases: Dict[str, Optional[AliasedClass]], outer_to_inner_schema, get_projectable_entity
 ):
@@ -993,19 +1420,35 @@ def generate_projections(
                     outer_to_inner_schema
                 )
 
-    # check the consistency of projections
-    projection_index_to_field = {
-        index_in_sql_result: attrkey
-        for _, projected_entities_dict in tag_to_projected_fields.items()
-        for attrkey, index_in_sql_result in projected_entities_dict.items()
-    }
-    if len(projections) > len(projection_index_to_field):
+    # check the consistency of projections: a key projected twice for the same tag only keeps a single field entry
+    projected_field_count = sum(len(projected_fields) for projected_fields in tag_to_projected_fields.values())
+    if len(projections) > projected_field_count:
         raise ValueError('You are projecting the same key multiple times within the same node')
-    if not projection_index_to_field:
+    if not projected_field_count:
         raise ValueError('No projections requested')
     return projections, tag_to_projected_fields
 
 
+def generate_result_fields(
+    aliases: Dict[str, Optional[AliasedClass]], tag_to_projected: Dict[str, Dict[str, int]],
+    inner_to_outer_schema: Mapping[str, Mapping[str, str]]
+) -> List[Tuple[str, List[Tuple[str, int]]]]:
+    """Return the field names of the projections per tag, as they are returned to the ``QueryBuilder``.
+
+    The names only depend on the tables of the tags, so they are resolved once per query rather than for every row.
+    """
+    tag_to_fields = []
+    for tag, projected_entities_dict in tag_to_projected.items():
+        alias = aliases.get(tag)
+        if alias is None:
+            raise ValueError(f'No alias found for tag {tag}')
+        property_mapping = inner_to_outer_schema.get(get_table_name(alias), _EMPTY_MAPPING)
+        fields = [(property_mapping.get(attrkey, attrkey), project_index)
+                  for attrkey, project_index in projected_entities_dict.items()]
+        tag_to_fields.append((tag, fields))
+    return tag_to_fields
+
+
 def _create_projections(
     tag: str,
     aliases: Dict[str, Optional[AliasedClass]],
@@ -1071,8 +1514,7 @@ def _get_projection(
 
     :return: The projection
     """
-    column_name = projectable_entity_name.split('.')[0]
-    attr_key = projectable_entity_name.split('.')[1:]
+    column_name, *attr_key = projectable_entity_name.split('.')
 
     if column_name == '*':
         if func is not None:
@@ -1086,14 +1528,10 @@ def _get_projection(
 
     entity_to_project = get_projectable_entity(alias, column_name, attr_key, cast=cast)
     if func is None:
-        pass
-    elif func == 'max':
-        entity_to_project = sa_func.max(entity_to_project)  # pylint: disable=not-callable
-    elif func == 'min':
-        entity_to_project = sa_func.max(entity_to_project)  # pylint: disable=not-callable
-    elif func == 'count':
-        entity_to_project = sa_func.count(entity_to_project)  # pylint: disable=not-callable
-    else:
+        return entity_to_project, False
+
+    function = PROJECTION_FUNCTIONS.get(func)
+    if function is None:
         raise ValueError(f'\nInvalid function specification {func}')
 
-    return entity_to_project, False
+    return function(entity_to_project), False
@@ -14,7 +14,8 @@ but redefines the SQLAlchemy models to the SQLite compatible ones.
 """
 from functools import singledispatch
 import json
-from typing import Any, List, Optional, Tuple, Union
+from types import MappingProxyType
+from typing import Any, List, Optional, Sequence, Tuple, Union
 
 from sqlalchemy import JSON, case, func
 from sqlalchemy.orm.util import AliasedClass
@@ -23,12 +24,10 @@ from sqlalchemy.sql import ColumnElement
 from aiida.common.lang import type_check
 from aiida.storage.psql_dos.orm import authinfos, comments, computers, entities, groups, logs, nodes, users, utils
 from aiida.storage.psql_dos.orm.querybuilder.main import (
+    COLUMN_OPERATORS,
+    VALID_COLUMN_TYPES,
     BinaryExpression,
-    Cast,
-    ColumnClause,
     InstrumentedAttribute,
-    Label,
-    QueryableAttribute,
     SqlaQueryBuilder,
     String,
     get_column,
@@ -37,6 +36,16 @@ from aiida.storage.psql_dos.orm.querybuilder.main import (
 from . import models
 from .utils import ReadOnlyError
 
+#: mapping of the filter operators on columns to the function that builds the expression, where the ``like`` operators
+#: have to specify the escape character explicitly for SQLite
+SQLITE_COLUMN_OPERATORS = MappingProxyType({
+    **COLUMN_OPERATORS,
+    # the like operator expects a string, so we cast to avoid problems
+    # with fields like UUID, which don't support the like operator
+    'like': lambda column, value: column.cast(String).like(value, escape='\\'),
+    'ilike': lambda column, value: column.ilike(value, escape='\\'),
+})
+
 
 class SqliteEntityOverride:
     """Overrides type-checking of psql_dos ``Entity``."""
@@ -154,6 +163,8 @@ class SqliteNodeCollection(nodes.SqlaNodeCollection):
 class SqliteQueryBuilder(SqlaQueryBuilder):
     """QueryBuilder to use with SQLAlchemy-backend, adapted for SQLite."""
 
+    __slots__ = ()
+
     @property
     def Node(self):
         return models.DbNode
@@ -222,7 +233,7 @@ class SqliteQueryBuilder(SqlaQueryBuilder):
 
     @staticmethod
     def get_filter_expr_from_jsonb(  # pylint: disable=too-many-return-statements,too-many-branches
-        operator: str, value, attr_key: List[str], column=None, column_name=None, alias=None
+        operator: str, value, attr_key: Sequence[str], column=None, column_name=None, alias=None
     ):
         """Return a filter expression.
 
@@ -268,10 +279,10 @@ class SqliteQueryBuilder(SqlaQueryBuilder):
         if operator == '<':
             type_filter, casted_entity = _cast_json_type(database_entity, value)
             return case((type_filter, casted_entity < value), else_=False)
-        if operator in ('>=', '=>'):
+        if operator == '>=':
             type_filter, casted_entity = _cast_json_type(database_entity, value)
             return case((type_filter, casted_entity >= value), else_=False)
-        if operator in ('<=', '=<'):
+        if operator == '<=':
             type_filter, casted_entity = _cast_json_type(database_entity, value)
             return case((type_filter, casted_entity <= value), else_=False)
 
@@ -334,32 +345,12 @@ class SqliteQueryBuilder(SqlaQueryBuilder):
 
     @staticmethod
     def get_filter_expr_from_column(operator: str, value: Any, column) -> BinaryExpression:
-        # Label is used because it is what is returned for the
-        # 'state' column by the hybrid_column construct
-        if not isinstance(column, (Cast, InstrumentedAttribute, QueryableAttribute, Label, ColumnClause)):
+        if not isinstance(column, VALID_COLUMN_TYPES):
             raise TypeError(f'column ({type(column)}) {column} is not a valid column')
-        database_entity = column
-        if operator == '==':
-            expr = database_entity == value
-        elif operator == '>':
-            expr = database_entity > value
-        elif operator == '<':
-            expr = database_entity < value
-        elif operator == '>=':
-            expr = database_entity >= value
-        elif operator == '<=':
-            expr = database_entity <= value
-        elif operator == 'like':
-            # the like operator expects a string, so we cast to avoid problems
-            # with fields like UUID, which don't support the like operator
-            expr = database_entity.cast(String).like(value, escape='\\')
-        elif operator == 'ilike':
-            expr = database_entity.ilike(value, escape='\\')
-        elif operator == 'in':
-            expr = database_entity.in_(value)
-        else:
+        build_expression = SQLITE_COLUMN_OPERATORS.get(operator)
+        if build_expression is None:
             raise ValueError(f'Unknown operator {operator} for filters on columns')
-        return expr
+        return build_expression(column, value)
 
 
 @singledispatch
@@ -10,6 +10,7 @@
 # pylint: disable=attribute-defined-outside-init,invalid-name,missing-docstring,too-many-lines,unused-argument
 """Tests for the QueryBuilder."""
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import copy
 from datetime import date, datetime, timedelta
 from itertools import chain
@@ -391,6 +392,53 @@ class TestBasic:
         assert id(query1) != id(query2)
         assert id(query2) == id(query3)
 
+    def test_query_cache(self):
+        """Test that queries that only differ in the values of the filters are not rebuilt."""
+        for label in ('cache-a', 'cache-b', 'cache-b'):
+            orm.Data(label=label).store()
+
+        qb = orm.QueryBuilder().append(orm.Data, tag='data', filters={'label': 'cache-a'})
+        assert qb.count() == 1
+        query1 = qb._impl.get_query(qb.as_dict())  # pylint: disable=protected-access
+
+        qb.add_filter('data', {'label': 'cache-b'})
+        assert qb.count() == 2
+        query2 = qb._impl.get_query(qb.as_dict())  # pylint: disable=protected-access
+        assert query2 is not query1
+        assert query2.tag_to_alias is query1.tag_to_alias
+        assert qb._impl.get_query(qb.as_dict()) is query2  # pylint: disable=protected-access
+
+        # the built query is shared as a template with the instances that use the same session
+        other = orm.QueryBuilder().append(orm.Data, tag='data', filters={'label': 'cache-a'})
+        assert other._impl.get_query(other.as_dict()).tag_to_alias is query1.tag_to_alias  # pylint: disable=protected-access
+        assert other.count() == 1
+
+        # a query from a template is bound to the session of the thread it is used in
+        def is_bound_to_thread_session():
+            other = orm.QueryBuilder().append(orm.Data, tag='data', filters={'label': 'cache-a'})
+            return other._impl.get_query(other.as_dict()).query.session is other._impl.get_session()  # pylint: disable=protected-access
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            assert executor.submit(is_bound_to_thread_session).result()
+
+        qb.add_filter('data', {'label': 'cache-a'})
+        assert qb.count() == 1
+        assert "'cache-a'" in qb.as_sql(inline=True)
+
+        qb.add_filter('data', {'label': {'in': ['cache-a', 'cache-b']}})
+        assert qb.count() == 3
+
+        qb.order_by({'data': 'id'})
+        query3 = qb._impl.get_query(qb.as_dict())  # pylint: disable=protected-access
+        qb.limit(2).offset(1)
+        query4 = qb._impl.get_query(qb.as_dict())  # pylint: disable=protected-access
+        assert query4.tag_to_alias is query3.tag_to_alias
+        assert qb.count() == 2
+        qb.offset(2)
+        assert qb.count() == 1
+        qb.limit(None).offset(None)
+        assert qb.count() == 3
+
     def test_dict_multiple_projections(self):
         """Test that the `.dict()` accumulator with multiple projections returns the correct types."""
         node = orm.Data().store()
@@ -406,6 +454,33 @@ class TestBasic:
         assert dictionary['*'].pk == node.pk
         assert dictionary['id'] == node.pk
 
+    def test_projection_functions(self):
+        """Test the ``func`` key of projections."""
+        for value in (3, 1, 2):
+            node = orm.Data()
+            node.base.attributes.set('func_value', value)
+            node.store()
+
+        filters = {'attributes.func_value': {'>': 0}}
+
+        def project(func):
+            qb = orm.QueryBuilder().append(
+                orm.Data,
+                filters=filters,
+                project={'attributes.func_value': {
+                    'cast': 'i',
+                    'func': func
+                }},
+            )
+            return qb.first(flat=True)
+
+        assert project('max') == 3
+        assert project('min') == 1
+        assert project('count') == 3
+
+        with pytest.raises(ValueError, match='Invalid function specification'):
+            project('sum')
+
     def test_operators_eq_lt_gt(self):
         nodes = [orm.Data() for _ in range(8)]
 
@@ -427,6 +502,13 @@ class TestBasic:
         assert orm.QueryBuilder().append(orm.Node, filters={'attributes.fa': {'<=': 1.02}}).count() == 4
         assert orm.QueryBuilder().append(orm.Node, filters={'attributes.fa': {'>': 1.02}}).count() == 4
         assert orm.QueryBuilder().append(orm.Node, filters={'attributes.fa': {'>=': 1.02}}).count() == 5
+        assert orm.QueryBuilder().append(orm.Node, filters={'attributes.fa': {'=<': 1.02}}).count() == 4
+        assert orm.QueryBuilder().append(orm.Node, filters={'attributes.fa': {'=>': 1.02}}).count() == 5
+
+        # the aliases also apply to filters on columns
+        pks = [node.pk for node in nodes]
+        assert orm.QueryBuilder().append(orm.Node, filters={'id': {'in': pks, '=<': pks[3]}}).count() == 4
+        assert orm.QueryBuilder().append(orm.Node, filters={'id': {'in': pks, '=>': pks[3]}}).count() == 5
 
     def test_subclassing(self):
         s = orm.StructureData()
@@ -715,6 +797,49 @@ class TestBasic:
         assert builder.one()[0] == LinkQuadruple(d2.pk, c2.pk, LinkType.INPUT_CALC.value, 'link_d2c2')
 
 
+class TestOperators:
+    """Test the operators of filters."""
+
+    def test_operators_and_or(self):
+        """Test the ``and`` and ``or`` operators on a single field, also when nested."""
+        for value in range(6):
+            node = orm.Data()
+            node.base.attributes.set('fb', value)
+            node.store()
+
+        def count(operations):
+            return orm.QueryBuilder().append(orm.Data, filters={'attributes.fb': operations}).count()
+
+        assert count({'and': [{'>': 0}, {'<': 4}]}) == 3
+        assert count({'and': [{'>': 0}, {'and': [{'<': 4}, {'!==': 2}]}]}) == 2
+        assert count({'or': [{'==': 0}, {'or': [{'==': 4}, {'and': [{'>': 1}, {'<': 3}]}]}]}) == 3
+        assert count({'and': [{'>': 0}, {'~and': [{'>': 1}, {'<': 5}]}]}) == 2
+
+    def test_operator_in_validation(self):
+        """Test the validation of the value of the ``in`` operator, also for a query built with a valid value before."""
+        orm.QueryBuilder().append(orm.Node, filters={'id': {'in': [1, 2]}}).all()
+
+        with pytest.raises(ValueError, match='empty list'):
+            orm.QueryBuilder().append(orm.Node, filters={'id': {'in': []}}).all()
+
+        with pytest.raises(ValueError, match='more than one type'):
+            orm.QueryBuilder().append(orm.Node, filters={'id': {'in': [1, '2']}}).all()
+
+        with pytest.raises(TypeError, match='could not be iterated'):
+            orm.QueryBuilder().append(orm.Node, filters={'id': {'in': 1}}).all()
+
+    def test_operator_negation(self):
+        """Test that a single ``~`` or ``!`` negates an operator, while a repeated negation prefix is rejected."""
+        pk = orm.Data().store().pk
+
+        assert orm.QueryBuilder().append(orm.Data, filters={'id': {'==': pk, '!in': [pk]}}).count() == 0
+        assert orm.QueryBuilder().append(orm.Data, filters={'id': {'==': pk, '~in': [pk + 1]}}).count() == 1
+
+        for operator in ('~~==', '!!in', '~!in'):
+            with pytest.raises(ValueError, match='Unknown operator'):
+                orm.QueryBuilder().append(orm.Data, filters={'id': {operator: [pk]}}).all()
+
+
 class TestMultipleProjections:
     """Unit tests for the QueryBuilder ORM class."""
 
@@ -838,6 +963,28 @@ def test_analyze_query():
     assert 'uuid' in analysis_str, analysis_str
 
 
+@pytest.mark.usefixtures('aiida_profile_clean')
+@pytest.mark.parametrize('path', ('attributes.value', 'attributes.values.0'))
+@pytest.mark.parametrize('values', ((False, True), (True, False), (0, 1), (1, 0)))
+def test_query_cache_filter_values(path, values):
+    """Test that the filter values substituted in a cached query select the same nodes as a newly built query.
+
+    Booleans and the integers equal to them are tested in particular, since the type-guarded comparison of a JSONB value
+    also contains the literal ``False`` that is returned if the type of the value does not match.
+    """
+    pks = {value: orm.Dict({'value': value, 'values': [value]}).store().pk for value in values}
+    first, second = values
+
+    qb = orm.QueryBuilder().append(orm.Dict, tag='dict', filters={path: first}, project='id')
+    assert qb.all(flat=True) == [pks[first]]
+    qb.add_filter('dict', {path: second})
+    assert qb.all(flat=True) == [pks[second]]
+
+    # a new query builder for the same session reuses the query built above as a template
+    qb = orm.QueryBuilder().append(orm.Dict, filters={path: second}, project='id')
+    assert qb.all(flat=True) == [pks[second]]
+
+
 class TestQueryBuilderCornerCases:
     """
     In this class corner cases of QueryBuilder are added.
@@ -951,6 +1098,51 @@ class TestAttributes:
         res = [str(_) for _, in qb.all()]
         assert set(res) == set((n_arr.uuid,))
 
+    def test_attribute_null_and_array(self):
+        """Test filtering attributes on ``None`` and list values."""
+        key = 'value_test_attr_null_array'
+        n_null, n_arr, n_dict = [orm.Data() for _ in range(3)]
+        n_null.base.attributes.set(key, None)
+        n_arr.base.attributes.set(key, [4, 3, 5])
+        n_dict.base.attributes.set(key, {'a': 1})
+
+        for n in (n_null, n_arr, n_dict):
+            n.store()
+
+        qb = orm.QueryBuilder().append(orm.Data, filters={f'attributes.{key}': None}, project='uuid')
+        assert set(qb.all(flat=True)) == {n_null.uuid}
+        qb = orm.QueryBuilder().append(orm.Data, filters={f'attributes.{key}': [4, 3, 5]}, project='uuid')
+        assert set(qb.all(flat=True)) == {n_arr.uuid}
+        qb = orm.QueryBuilder().append(orm.Data, filters={f'attributes.{key}': {'==': {'a': 1}}}, project='uuid')
+        assert set(qb.all(flat=True)) == {n_dict.uuid}
+
+    def test_attribute_nested_equality(self):
+        """Test the equality of a nested attribute, which is checked by containment of the value."""
+        key = 'value_test_attr_nested'
+        n_nested, n_other, n_arr, n_missing = [orm.Data() for _ in range(4)]
+        n_nested.base.attributes.set(key, {'sub': 'value', 'other': 2})
+        n_other.base.attributes.set(key, {'sub': 'other'})
+        n_arr.base.attributes.set(key, {'sub': ['value']})
+        n_missing.base.attributes.set(key, {})
+
+        for n in (n_nested, n_other, n_arr, n_missing):
+            n.store()
+
+        qb = orm.QueryBuilder().append(orm.Data, filters={f'attributes.{key}.sub': 'value'}, project='uuid')
+        assert set(qb.all(flat=True)) == {n_nested.uuid}
+        qb = orm.QueryBuilder().append(orm.Data, filters={f'attributes.{key}.other': 2.0}, project='uuid')
+        assert set(qb.all(flat=True)) == {n_nested.uuid}
+        filters = {
+            'id': {
+                'in': [n_nested.pk, n_other.pk, n_arr.pk, n_missing.pk]
+            },
+            f'attributes.{key}.sub': {
+                '!==': 'value'
+            },
+        }
+        qb = orm.QueryBuilder().append(orm.Data, filters=filters, project='uuid')
+        assert set(qb.all(flat=True)) == {n_other.uuid, n_arr.uuid, n_missing.uuid}
+
 
 class TestQueryBuilderLimitOffsets:
 
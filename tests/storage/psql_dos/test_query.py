@@ -45,3 +45,60 @@ def test_qb_ordering_limits_offsets_sqla():
     q_b.limit(3)
     res = next(zip(*q_b.all()))
     assert res == tuple(range(5, 8))
+
+
+@pytest.mark.usefixtures('aiida_profile_clean')
+def test_qb_join_order():
+    """Test that the vertices of a path are joined after the vertex that they are joined with."""
+    from aiida.common.links import LinkType
+    from aiida.orm import CalculationNode
+
+    data_in = Data().store()
+    calc = CalculationNode()
+    calc.base.links.add_incoming(data_in, link_type=LinkType.INPUT_CALC, link_label='input')
+    calc.store()
+    data_out = Data()
+    data_out.base.links.add_incoming(calc, link_type=LinkType.CREATE, link_label='output')
+    data_out.store()
+
+    q_b = QueryBuilder().append(Data, filters={'id': data_in.pk}, tag='input')
+    q_b.append(CalculationNode, with_incoming='input', tag='calc')
+    q_b.append(Data, with_incoming='calc', project='id')
+    assert q_b.all(flat=True) == [data_out.pk]
+
+    # swap the vertices such that the last tag comes before the tag it is joined with
+    data = q_b.as_dict()
+    data['path'][1], data['path'][2] = data['path'][2], data['path'][1]
+    assert q_b._impl.count(data) == 1  # pylint: disable=protected-access
+
+
+@pytest.mark.usefixtures('aiida_profile_clean')
+def test_qb_join_elimination():
+    """Test that intermediate nodes that only connect links are not joined."""
+    from aiida.common.links import LinkType
+    from aiida.orm import CalculationNode
+
+    data_in = Data().store()
+    calc = CalculationNode()
+    calc.base.links.add_incoming(data_in, link_type=LinkType.INPUT_CALC, link_label='input')
+    calc.store()
+    data_out = Data()
+    data_out.base.links.add_incoming(calc, link_type=LinkType.CREATE, link_label='output')
+    data_out.store()
+
+    q_b = QueryBuilder().append(Data, filters={'id': data_in.pk}, tag='input')
+    q_b.append(Node, with_incoming='input', tag='calc', edge_project='label')
+    q_b.append(Data, with_incoming='calc', project='id')
+    assert q_b.all() == [[data_out.pk, 'input']]
+    assert q_b.as_sql(inline=True).count('JOIN db_dbnode') == 1
+
+    q_b = QueryBuilder().append(Data, filters={'id': data_out.pk}, tag='output')
+    q_b.append(Node, with_outgoing='output', tag='calc')
+    q_b.append(Data, with_outgoing='calc', project='id')
+    assert q_b.all(flat=True) == [data_in.pk]
+    assert q_b.as_sql(inline=True).count('JOIN db_dbnode') == 1
+
+    # the intermediate node is joined if it is used otherwise
+    q_b.add_filter('calc', {'id': calc.pk})
+    assert q_b.all(flat=True) == [data_in.pk]
+    assert q_b.as_sql(inline=True).count('JOIN db_dbnode') == 2
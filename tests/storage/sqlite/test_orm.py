@@ -348,6 +348,25 @@ def test_qb_json_filters(filters, matches):
     assert qbuilder.count() == matches
 
 
+@pytest.mark.parametrize('values', ((False, True), (True, False), (0, 1), (1, 0)))
+def test_qb_json_filter_values(values):
+    """Test that the filter values substituted in a cached query select the same nodes as a newly built query."""
+    profile = SqliteTempBackend.create_profile(debug=False)
+    backend = SqliteTempBackend(profile)
+    pks = {value: Dict({'value': value}, backend=backend).store().pk for value in values}
+    first, second = values
+
+    qbuilder = QueryBuilder(backend=backend)
+    qbuilder.append(Dict, tag='dict', filters={'attributes.value': first}, project='id')
+    assert qbuilder.all(flat=True) == [pks[first]]
+    qbuilder.add_filter('dict', {'attributes.value': second})
+    assert qbuilder.all(flat=True) == [pks[second]]
+
+    qbuilder = QueryBuilder(backend=backend)
+    qbuilder.append(Dict, filters={'attributes.value': second}, project='id')
+    assert qbuilder.all(flat=True) == [pks[second]]
+
+
 @pytest.mark.parametrize(
     'filters,matches', (
         ({